@@ -8,12 +8,42 @@ from dotenv import load_dotenv
 import base64
 from datetime import datetime
 import time
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 load_dotenv()
 
+if orjson is not None:
+    json_loads = orjson.loads
+
+    def json_dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+else:
+    json_loads = json.loads
+
+    def json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("AudioService")
 
+# The DeepGram connection parameters are fixed, so build the URL once
+DEEPGRAM_URL = "wss://api.deepgram.com/v1/listen?" + urlencode({
+    "encoding": "linear16",
+    "sample_rate": "16000",
+    "channels": "1",
+    "punctuate": "true",
+    "interim_results": "true"
+})
+
+# Static control frames, serialized once
+KEEPALIVE_FRAME = json_dumps({"type": "KeepAlive"})
+CLOSE_FRAME = json_dumps({"type": "CloseStream"})
+
 class AudioService:
     def __init__(self, transcript_queue: asyncio.Queue, transcript_wait_time: float):
         self.transcript_wait_time = transcript_wait_time
@@ -21,27 +51,27 @@ class AudioService:
         self.transcript_queue = transcript_queue
         self.speech_start_timestamp = None
         self.last_audio_start_time = None
+        # Monotonic time of the last frame sent to DeepGram, used to skip
+        # KeepAlives while audio is actively streaming
+        self._last_send = time.monotonic()
 
     def build_deepgram_url(self):
-        base_url = "wss://api.deepgram.com/v1/listen"
-        params = {
-            "encoding": "linear16",
-            "sample_rate": "16000",
-            "channels": "1",
-            "punctuate": "true",
-            "interim_results": "true"
-        }
-        query_string = urlencode(params)
-        return f"{base_url}?{query_string}"
+        return DEEPGRAM_URL
 
     async def send_keepalive(self):
-        """Send keepalive messages to DeepGram every 9 seconds"""
+        """Send a KeepAlive to DeepGram once the connection has been idle for 9 seconds"""
         while True:
             try:
-                await asyncio.sleep(9)  # Wait 9 seconds
+                # Sleep until the idle deadline; real traffic pushes it forward
+                # so no KeepAlive is sent while audio is streaming
+                sleep_for = 9 - (time.monotonic() - self._last_send)
+                if sleep_for > 0:
+                    await asyncio.sleep(sleep_for)
+                    continue
                 if self.deepgram_ws:
-                    await self.deepgram_ws.send(json.dumps({"type": "KeepAlive"}))
+                    await self.deepgram_ws.send(KEEPALIVE_FRAME)
                     logger.debug("📤 Sent KeepAlive to DeepGram")
+                self._last_send = time.monotonic()
             except Exception as e:
                 logger.error(f"Error sending KeepAlive: {e}")
                 break
@@ -74,9 +104,15 @@ class AudioService:
             return False
 
         try:
+            # Deepgram streams many small JSON frames: skip permessage-deflate
+            # (compression costs more than it saves on these payloads) and use a
+            # larger receive queue to avoid backpressure stalls
             self.deepgram_ws = await websockets.connect(
                 dg_url,
-                additional_headers={"Authorization": f"Token {dg_api_key}"}
+                additional_headers={"Authorization": f"Token {dg_api_key}"},
+                compression=None,
+                max_size=2**20,
+                max_queue=256
             )
             logger.info("🟢 Connected to Deepgram")
             return True
@@ -92,7 +128,8 @@ class AudioService:
         
         try:
             await self.deepgram_ws.send(audio_data)
-            logger.debug(f"📤 Sent audio to DeepGram: {len(audio_data)} bytes")
+            self._last_send = time.monotonic()
+            logger.debug("📤 Sent audio to DeepGram: %d bytes", len(audio_data))
             return True
         except Exception as e:
             logger.error(f"❌ Error sending audio to DeepGram: {e}")
@@ -105,17 +142,22 @@ class AudioService:
             return False
         
         try:
-            await self.deepgram_ws.send(json.dumps(control_data))
+            await self.deepgram_ws.send(json_dumps(control_data))
+            self._last_send = time.monotonic()
             logger.info(f"📤 Sent control to DeepGram: {control_data}")
             return True
         except Exception as e:
             logger.error(f"❌ Error sending control to DeepGram: {e}")
             return False
 
-    async def handle_message(self, message: str):
-        """Handle structured message from client"""
+    async def handle_message(self, message):
+        """Handle a message from the client - binary frames are raw audio, text frames are JSON"""
+        if isinstance(message, (bytes, bytearray)):
+            await self.send_audio(message)
+            return
+
         try:
-            data = json.loads(message)
+            data = json_loads(message)
             message_type = data.get("type")
             
             if message_type == "audio":
@@ -125,7 +167,7 @@ class AudioService:
                 if audio_data:
                     audio_bytes = base64.b64decode(audio_data)
                     await self.send_audio(audio_bytes)
-                    logger.debug(f"📤 Processed audio message: {len(audio_bytes)} bytes")
+                    logger.debug("📤 Processed audio message: %d bytes", len(audio_bytes))
                     
                     # Store the speech start timestamp once and never overwrite it
                     if start_time and self.speech_start_timestamp is None:
@@ -135,14 +177,28 @@ class AudioService:
                     # Always update the last audio start time
                     if start_time:
                         self.last_audio_start_time = start_time
-                        logger.debug(f"🎤 Last audio start time updated: {start_time}")
+                        logger.debug("🎤 Last audio start time updated: %s", start_time)
                 else:
                     logger.warning("Audio message missing data")
-                    
+
+            elif message_type == "speech_start":
+                start_time = data.get("startTime")
+                if start_time:
+                    # Store the speech start timestamp once and never overwrite it
+                    if self.speech_start_timestamp is None:
+                        self.speech_start_timestamp = start_time
+                        logger.info(f"🎤 Speech start timestamp recorded once: {start_time}")
+
+                    # Always update the last audio start time
+                    self.last_audio_start_time = start_time
+                    logger.debug("🎤 Last audio start time updated: %s", start_time)
+                else:
+                    logger.warning("Speech start message missing startTime")
+
             elif message_type == "control":
                 control_data = data.get("data", {})
                 await self.send_control(control_data)
-                logger.debug(f"📤 Processed control message: {control_data}")
+                logger.debug("📤 Processed control message: %s", control_data)
             else:
                 logger.warning(f"Unknown message type: {message_type}")
                 
@@ -151,36 +207,40 @@ class AudioService:
         except Exception as e:
             logger.error(f"Error processing message: {e}")
 
-    def adjust_timestamps(self, response):
-        """Adjust timestamps for the response and all words using the speech start timestamp"""
+    def adjust_timestamps(self, response, alt0=None):
+        """Adjust timestamps for the response and all words using the speech start timestamp
+
+        The caller can pass the already-extracted first alternative to avoid
+        re-navigating the response structure."""
         if self.speech_start_timestamp is None:
             return response
         
         epoch_start_time = self.speech_start_timestamp
-        
-        # Add response retrieval time
-        response["retrieval_time"] = time.time()
-        
+
         # Adjust the overall start time
         original_start = response.get("start", 0)
         response["start"] = original_start + epoch_start_time
-        logger.debug(f"🕐 Adjusted response start time: {original_start} -> {response['start']}")
+        logger.debug("🕐 Adjusted response start time: %s -> %s", original_start, response["start"])
         
         # Adjust timestamps for each word in the response
         try:
-            alternatives = response.get("channel", {}).get("alternatives", [])
-            if alternatives and len(alternatives) > 0:
-                words = alternatives[0].get("words", [])
-                for word in words:
+            if alt0 is None:
+                alternatives = response.get("channel", {}).get("alternatives", [])
+                alt0 = alternatives[0] if alternatives else {}
+            words = alt0.get("words", [])
+            if words:
+                # Add the offset to all word timestamps in one vectorized
+                # pass instead of a Python loop per field
+                count = len(words)
+                starts = np.fromiter((word.get("start", 0.0) for word in words), dtype=np.float64, count=count)
+                ends = np.fromiter((word.get("end", 0.0) for word in words), dtype=np.float64, count=count)
+                starts += epoch_start_time
+                ends += epoch_start_time
+                for word, start, end in zip(words, starts, ends):
                     if "start" in word:
-                        original_word_start = word["start"]
-                        word["start"] = original_word_start + epoch_start_time
-                        logger.debug(f"🕐 Adjusted word '{word.get('word', '')}' start: {original_word_start} -> {word['start']}")
-                    
+                        word["start"] = float(start)
                     if "end" in word:
-                        original_word_end = word["end"]
-                        word["end"] = original_word_end + epoch_start_time
-                        logger.debug(f"🕐 Adjusted word '{word.get('word', '')}' end: {original_word_end} -> {word['end']}")
+                        word["end"] = float(end)
         except Exception as e:
             logger.error(f"Error adjusting word timestamps: {e}")
         
@@ -195,28 +255,34 @@ class AudioService:
         try:
             async for msg in self.deepgram_ws:
                 try:
-                    response = json.loads(msg)
-                    
-                    transcript = (
-                        response.get("channel", {})
-                                .get("alternatives", [{}])[0]
-                                .get("transcript", "")
-                    )
+                    response = json_loads(msg)
+
+                    # Navigate the structure once and reject interim/empty
+                    # results before doing any timestamp work
+                    alternatives = response.get("channel", {}).get("alternatives")
+                    alt0 = alternatives[0] if alternatives else {}
+                    transcript = alt0.get("transcript", "")
                     is_final = response.get("is_final", False)
-                    
+
                     if transcript and is_final:
                         logger.info(f"📤 Received transcript from DeepGram: {response}")
-                        response = self.adjust_timestamps(response)
-                        
-                        if self.last_audio_start_time and "retrieval_time" in response:
-                            time_diff = response["retrieval_time"] - self.last_audio_start_time
+                        response = self.adjust_timestamps(response, alt0)
+
+                        if self.last_audio_start_time:
+                            # last_audio_start_time is a wall-clock epoch
+                            # stamp from the browser, so compare it against
+                            # wall-clock time here
+                            time_diff = time.time() - self.last_audio_start_time
                             if time_diff > self.transcript_wait_time:
                                 logger.warning(f"⏰ Skipping transcript - time difference too large: {time_diff:.3f}s > 0.5s")
                                 continue
                             else:
-                                logger.debug(f"⏰ Time difference acceptable: {time_diff:.3f}s")
+                                logger.debug("⏰ Time difference acceptable: %.3fs", time_diff)
                         
-                        await self.transcript_queue.put(response)
+                        # Carry the monotonic retrieval time as the first
+                        # tuple element so the consumer can age-check an
+                        # item without touching the response dict
+                        await self.transcript_queue.put((time.monotonic(), response))
                 except Exception as e:
                     logger.warning(f"Failed to parse Deepgram response: {e}. Raw message: {msg}")
         except websockets.exceptions.ConnectionClosed:
@@ -228,7 +294,7 @@ class AudioService:
         """Close the DeepGram connection"""
         if self.deepgram_ws:
             try:
-                await self.deepgram_ws.send(json.dumps({"type": "CloseStream"}))
+                await self.deepgram_ws.send(CLOSE_FRAME)
                 await self.deepgram_ws.close()
                 logger.info("🔴 Closed DeepGram connection")
             except Exception as e:
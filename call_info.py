@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 from typing import Optional
 
 class CallState(BaseModel):
@@ -13,6 +13,49 @@ class CallState(BaseModel):
     authorization_required: Optional[bool] = None
     reference_number: Optional[str] = None
 
+    # Bumped on every field update so cached messages built from this
+    # state can be invalidated cheaply
+    _version: int = PrivateAttr(default=0)
+    # One bit per field (in declaration order), set while the field holds a
+    # value - makes the "is everything collected" check a single int compare
+    _present_mask: int = PrivateAttr(default=0)
+
+    def model_post_init(self, __context):
+        mask = 0
+        for name, bit in _FIELD_BITS.items():
+            if getattr(self, name) is not None:
+                mask |= bit
+        self._present_mask = mask
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if not name.startswith("_"):
+            self._version += 1
+            bit = _FIELD_BITS.get(name)
+            if bit is not None:
+                if value is not None:
+                    self._present_mask |= bit
+                else:
+                    self._present_mask &= ~bit
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def is_complete(self) -> bool:
+        return self._present_mask == _FULL_MASK
+
+    def first_missing_field(self):
+        """Name of the first field still missing a value, or None if complete"""
+        missing = (~self._present_mask) & _FULL_MASK
+        if not missing:
+            return None
+        return _FIELD_NAMES[(missing & -missing).bit_length() - 1]
+
+_FIELD_NAMES = tuple(CallState.model_fields)
+_FIELD_BITS = {name: 1 << i for i, name in enumerate(_FIELD_NAMES)}
+_FULL_MASK = (1 << len(_FIELD_NAMES)) - 1
+
 class PatientInfo(BaseModel):
     name: str = "John Doe"
     date_of_birth: str = "January 1st 1980"
@@ -31,7 +31,12 @@ class AudioClient:
     async def connect(self):
         """Connect to the WebSocket server"""
         try:
-            self.websocket = await websockets.connect(self.server_url)
+            # Raw PCM chunks don't compress well, so skip permessage-deflate
+            self.websocket = await websockets.connect(
+                self.server_url,
+                compression=None,
+                max_queue=256
+            )
             self.connected = True
             logger.info(f"Connected to server at {self.server_url}")
             return True
@@ -102,19 +107,26 @@ class AudioClient:
         
         logger.info("Started sending microphone audio to server...")
         logger.info("Press Ctrl+C to stop")
-        
+
         try:
+            loop = asyncio.get_running_loop()
+            # Bind the per-chunk lookups once; PyAudio offers no read-into
+            # API, so the bytes object stream.read returns is reused as-is
+            # all the way to the socket without further copies
+            stream_read = self.stream.read
+            chunk = self.CHUNK
             while self.connected:
-                # Read audio data from microphone
-                audio_data = self.stream.read(self.CHUNK, exception_on_overflow=False)
-                
+                # stream.read blocks for the chunk duration, which paces the
+                # loop naturally; run it in an executor so the event loop
+                # stays responsive while it waits
+                audio_data = await loop.run_in_executor(
+                    None, stream_read, chunk, False
+                )
+
                 # Send audio data to server
                 if self.websocket and self.connected:
                     await self.websocket.send(audio_data)
-                
-                # Small delay to prevent overwhelming the server
-                await asyncio.sleep(0.01)
-                
+
         except Exception as e:
             logger.error(f"Error sending microphone audio: {e}")
     
@@ -125,24 +137,30 @@ class AudioClient:
             return
         
         logger.info("Started sending file audio to server...")
-        
+
         try:
+            # Pace chunks against a deadline so playback matches real time
+            # regardless of how long each send takes
+            loop = asyncio.get_running_loop()
+            target_interval = self.CHUNK / self.RATE
+            deadline = loop.time()
+
             while self.connected:
                 # Read audio data from file
                 audio_data = self.file_stream.readframes(self.CHUNK)
-                
+
                 # Check if we've reached the end of the file
                 if not audio_data:
                     logger.info("Reached end of audio file")
                     break
-                
+
                 # Send audio data to server
                 if self.websocket and self.connected:
                     await self.websocket.send(audio_data)
-                
-                # Small delay to simulate real-time streaming
-                await asyncio.sleep(0.01)
-                
+
+                deadline += target_interval
+                await asyncio.sleep(max(0, deadline - loop.time()))
+
         except Exception as e:
             logger.error(f"Error sending file audio: {e}")
     
@@ -246,6 +264,13 @@ async def main():
     await client.run(args.file)
 
 if __name__ == "__main__":
+    try:
+        import uvloop
+        uvloop.install()
+        logger.info("Using uvloop event loop")
+    except ImportError:
+        logger.info("uvloop not available, using default event loop")
+
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
@@ -3,15 +3,24 @@ import websockets
 import json
 import logging
 import os
+import re
+from collections import deque
 import openai
 from dotenv import load_dotenv
-import nltk
 from typing import Callable, Awaitable
-nltk.download('punkt_tab')
-from nltk.tokenize import sent_tokenize
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from call_info import CallState, PatientInfo, CALL_STATE_EXPLANATIONS
 
+# Matches a run of sentence-ending punctuation followed by whitespace.
+# Used to split streamed responses into sentences without paying for a
+# full NLTK tokenizer pass on every chunk.
+_SENTENCE_END_RE = re.compile(r"[.!?]+(?=\s)")
+
 load_dotenv()
 
 logging.basicConfig(level=logging.INFO)
@@ -20,22 +29,42 @@ logger = logging.getLogger("OpenAIService")
 class OpenAIService:
     def __init__(self):
         self.openai_client = None
-        self.conversation_history = []
+        # Bounded history stored as parallel role/content deques: old turns
+        # fall off in O(1) and no per-turn dict is kept alive - dicts are
+        # materialized only when a request is actually built
+        self._roles = deque(maxlen=30)
+        self._contents = deque(maxlen=30)
         self.call_state = CallState()
         self.patient_info = PatientInfo()
         
         self.name = "Spike Bot"
 
+        # The patient info never changes, so serialize it once
+        if orjson is not None:
+            patient_info_json = orjson.dumps(
+                self.patient_info.model_dump(), option=orjson.OPT_INDENT_2
+            ).decode()
+        else:
+            patient_info_json = json.dumps(self.patient_info.model_dump(), indent=2)
+
         self.system_message = f"""
-            You are {self.name}, a data collector working for Spike Clinical. 
+            You are {self.name}, a data collector working for Spike Clinical.
             Your role is to gather necessary data from the insurance company representatives.
             You call them to get the information about the patien's insurance.
 
             The information about the patient that you can use to identify the patient:
-            {json.dumps(self.patient_info.model_dump(), indent=2)}
+            {patient_info_json}
 
             You don't offer assistance to the representative. You only ask for the information and respond to their questions to identify the patient.
         """
+
+        # Memoized call-state messages, keyed on the call state version so
+        # they are only rebuilt when a field actually changes
+        self._explanation_message_cache = (None, None)
+        self._missing_message_cache = (None, None)
+
+        # Single in-flight call-state parse task, replaced on every turn
+        self._parse_task = None
         
         # Initialize OpenAI client
         api_key = os.getenv("OPENAI_API_KEY")
@@ -46,25 +75,53 @@ class OpenAIService:
         self.openai_client = openai.AsyncOpenAI(api_key=api_key)
         logger.info("🤖 OpenAI client initialized")
         
+    @property
+    def conversation_history(self):
+        """Materialized view of the stored turns as role/content dicts"""
+        return [{"role": role, "content": content} for role, content in zip(self._roles, self._contents)]
+
+    @conversation_history.setter
+    def conversation_history(self, turns):
+        self._roles.clear()
+        self._contents.clear()
+        for turn in turns:
+            self._roles.append(turn["role"])
+            self._contents.append(turn["content"])
+
+    def append_turn(self, role: str, content: str):
+        self._roles.append(role)
+        self._contents.append(content)
+
     def get_call_state_explanation_message(self):
+        version, cached = self._explanation_message_cache
+        if version == self.call_state.version:
+            return cached
+
         system_message = self.system_message + "\nYou should summarize the conversation in a single paragraphusing the following information:\n"
         call_state_dict = self.call_state.model_dump()
         call_state_info = [f"{key} {value}" for key, value in call_state_dict.items()]
-        return system_message + "\n\n".join(call_state_info)
-    
+        message = system_message + "\n\n".join(call_state_info)
+        self._explanation_message_cache = (self.call_state.version, message)
+        return message
+
     def get_missing_information_message(self):
-        call_state_dict = self.call_state.model_dump()
-        missing_information = [f"{key} - {CALL_STATE_EXPLANATIONS[key]}" for key, value in call_state_dict.items() if value is None]
-        return f" {self.system_message}\nYou should ask the representative for the following information:\n{missing_information[0]}"
+        version, cached = self._missing_message_cache
+        if version == self.call_state.version:
+            return cached
+
+        missing_field = self.call_state.first_missing_field()
+        message = f" {self.system_message}\nYou should ask the representative for the following information:\n{missing_field} - {CALL_STATE_EXPLANATIONS[missing_field]}"
+        self._missing_message_cache = (self.call_state.version, message)
+        return message
         
     def get_system_message(self):
-        if len(self.conversation_history) == 1:
+        if len(self._roles) == 1:
             return {
                 "role": "system",
                 "content": self.system_message
             }
         else:
-            if all(value is not None for value in self.call_state.model_dump().values()):
+            if self.call_state.is_complete():
                 return {
                     "role": "system",
                     "content": self.get_call_state_explanation_message()
@@ -80,12 +137,22 @@ class OpenAIService:
             }
         
     def build_messages(self):
-        messages = self.conversation_history[-30:]
         system_message = self.get_system_message()
-        return [system_message] + messages
+        return [
+            system_message,
+            *({"role": role, "content": content} for role, content in zip(self._roles, self._contents))
+        ]
+
+    def _recent_turns(self, count: int):
+        """Materialize the newest `count` turns as role/content dicts"""
+        n = len(self._roles)
+        return [
+            {"role": self._roles[i], "content": self._contents[i]}
+            for i in range(max(0, n - count), n)
+        ]
     
     async def parse_response(self, response_messages):
-        """Parse the conversation messages into call_state via OpenAI parsing endpoint."""
+        """Parse the most recent conversation messages into call_state via OpenAI parsing endpoint."""
         try:
             system_message = {
                 "role": "system",
@@ -120,13 +187,16 @@ class OpenAIService:
         """Send transcript to OpenAI and get response, sending it sentence by sentence"""
         try:
             # Add user message to conversation history
-            self.conversation_history.append({
-                "role": "user",
-                "content": transcript
-            })
+            self.append_turn("user", transcript)
             logger.info(f"Transcript: {transcript}")
 
-            await self.parse_response(self.conversation_history)
+            # Parse only the newest turns, and do it concurrently with the
+            # chat completion so parsing latency overlaps token generation
+            if self._parse_task is not None and not self._parse_task.done():
+                self._parse_task.cancel()
+            self._parse_task = asyncio.create_task(
+                self.parse_response(self._recent_turns(2))
+            )
 
             messages = self.build_messages()
 
@@ -144,34 +214,32 @@ class OpenAIService:
             # Process response sentence by sentence
             full_response = ""
             sentence_buffer = ""
-            
+            scan_idx = 0
+
             async for chunk in stream:
                 if chunk.choices[0].delta.content:
                     content = chunk.choices[0].delta.content
                     sentence_buffer += content
                     full_response += content
-                    
-                    # Use NLTK's sent_tokenize to properly split sentences
-                    sentences = sent_tokenize(sentence_buffer)
-                    
-                    # If we have complete sentences, send them
-                    if len(sentences) > 1:
-                        # Send all complete sentences except the last one (which might be incomplete)
-                        for sentence in sentences[:-1]:
-                            await response_callback(sentence.strip())
-                        
-                        # Keep the last sentence in the buffer (might be incomplete)
-                        sentence_buffer = sentences[-1]
+
+                    # Emit complete sentences as soon as their boundary arrives;
+                    # only the newly arrived content is scanned (with a 2-char
+                    # lookback for punctuation split across chunks)
+                    match = _SENTENCE_END_RE.search(sentence_buffer, scan_idx)
+                    while match:
+                        sentence = sentence_buffer[:match.end()].strip()
+                        if sentence:
+                            await response_callback(sentence)
+                        sentence_buffer = sentence_buffer[match.end():]
+                        match = _SENTENCE_END_RE.search(sentence_buffer)
+                    scan_idx = max(0, len(sentence_buffer) - 2)
             
             if sentence_buffer.strip():
                 await response_callback(sentence_buffer.strip())
             
             # Add assistant response to conversation history
             if full_response:
-                self.conversation_history.append({
-                    "role": "assistant",
-                    "content": full_response
-                })
+                self.append_turn("assistant", full_response)
             
         except Exception as e:
             logger.error(f"❌ Error communicating with OpenAI: {e}")
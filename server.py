@@ -3,165 +3,268 @@ from asyncio import QueueEmpty
 import websockets
 import json
 import logging
-import os
 import time
-import re
 from audio_service import AudioService
 from openai_service import OpenAIService
 from dotenv import load_dotenv
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 load_dotenv()
 
+if orjson is not None:
+    json_dumps = orjson.dumps
+else:
+    def json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("MainServer")
 
+# Pre-serialized envelope fragments for the outbound turn messages: only
+# the content string is JSON-encoded per message, the rest is constant
+USER_TURN_PREFIX = b'{"type":"turn","data":{"role":"user","content":'
+ASSISTANT_TURN_PREFIX = b'{"type":"turn","data":{"role":"assistant","content":'
+TURN_SUFFIX = b'}}'
+BATCH_PREFIX = b'{"type":"batch","items":['
+BATCH_SUFFIX = b']}'
+
+class Latest:
+    """Single-slot hand-off that only ever holds the newest value
+
+    The transcript consumer always discards everything but the most
+    recent entry, so a full asyncio.Queue (deque plus waiter bookkeeping
+    per item) is wasted work under bursts. Producers overwrite the slot;
+    the consumer awaits the event and takes whatever is newest. put/get
+    mirror the asyncio.Queue coroutine API so either can be swapped in."""
+
+    def __init__(self):
+        self._value = None
+        self._event = asyncio.Event()
+
+    async def put(self, value):
+        self._value = value
+        self._event.set()
+
+    async def get(self):
+        await self._event.wait()
+        value = self._value
+        self._value = None
+        self._event.clear()
+        return value
+
 class MainServer:
     def __init__(self, host='localhost', port=8765):
         self.host = host
         self.port = port
-        self.transcript_queue = asyncio.Queue()
+        self.transcript_queue = Latest()
         self.transcript_wait_time = 0.5
         self.audio_service = AudioService(self.transcript_queue, self.transcript_wait_time)
 
         self.openai_service = OpenAIService()
 
         self.web_client = None
+        # Guards the check-and-swap of web_client against racing reconnects
+        self._client_lock = asyncio.Lock()
         self.periodic_task = None
+
+        # Outbound messages to the web client go through a single writer
+        # task so bursts (e.g. streamed AI sentences) can share one frame.
+        # The queue is bounded so a slow browser applies backpressure here
+        # instead of ballooning the socket's internal buffers
+        self.outbound_queue = asyncio.Queue(maxsize=64)
+        self.outbound_batch_size = 16
+        self.outbound_batch_window = 0.002
         
 
-    def parse_response(self, response):
+    @staticmethod
+    def parse_response(response):
+        # One cheap shape check up front instead of a catch-all; a repeating
+        # malformed frame then never pays for exception objects or tracebacks
+        if not isinstance(response, dict):
+            return ""
+
         try:
-            alternatives = response.get("channel", {}).get("alternatives", [])
-            if alternatives and len(alternatives) > 0:
+            # Bind each level once instead of chaining .get() calls that
+            # build throwaway default dicts
+            channel = response.get("channel")
+            alternatives = channel.get("alternatives") if channel else None
+            if alternatives:
                 return alternatives[0].get("transcript", "")
-            else:
-                logger.warning("🔤 No alternatives found in DeepGram response")
-                return ""
-                
-        except Exception as e:
-            logger.error(f"Error parsing DeepGram response: {e}")
+
+            logger.debug("🔤 No alternatives found in DeepGram response")
+            return ""
+
+        except (KeyError, IndexError, TypeError, AttributeError):
+            logger.debug("🔤 Malformed DeepGram response: %r", response)
             return ""
 
     async def process_transcripts_periodically(self):
-        logger.info("🔄 Starting periodic transcript processor")
+        logger.info("🔄 Starting transcript processor")
         while True:
             try:
-                await asyncio.sleep(0.1)
-                
-                # Process all transcripts from the queue
-                latest_response = None
-                current_time = time.time()
+                # The Latest slot already coalesces bursts down to the
+                # newest transcript, so a plain get is all that is needed.
+                # The retrieval time rides along as the first tuple element
+                # (monotonic, taken by the AudioService), so the age check
+                # never touches the response dict
+                retrieval_time, latest_response = await self.transcript_queue.get()
+                time_since_latest = time.monotonic() - retrieval_time
                 
-                while not self.transcript_queue.empty():
-                    try:
-                        latest_response = self.transcript_queue.get_nowait()
-                    except QueueEmpty:
-                        break
-                
-                if not latest_response:
-                    continue
-                
-                retrieval_time = latest_response.get("retrieval_time", 0)
-                time_since_latest = current_time - retrieval_time
-                
-                logger.info(f"🔄 Latest transcript retrieved {time_since_latest:.2f}s ago")
+                logger.debug("🔄 Latest transcript retrieved %.2fs ago", time_since_latest)
                 
                 if time_since_latest <= self.transcript_wait_time:
                     transcript = self.parse_response(latest_response)
                     
-                    # Send the transcript to client and OpenAI
-                    await self.send_transcripts_to_client(transcript)
-                    await self.send_words_to_openai(transcript)
-                
+                    # Send the transcript to client and OpenAI concurrently
+                    # so the client echo is not stuck behind the OpenAI
+                    # round-trip
+                    await asyncio.gather(
+                        self.send_transcripts_to_client(transcript),
+                        self.send_words_to_openai(transcript),
+                        return_exceptions=True
+                    )
+
             except Exception as e:
-                logger.error(f"❌ Error in periodic transcript processing: {e}")
+                logger.error(f"❌ Error in transcript processing: {e}")
+
+    def enqueue_outbound(self, message: bytes):
+        """Queue a serialized message for the web client without blocking the caller
+
+        When a slow client fills the queue, user transcripts are dropped
+        (they are continuously superseded by newer ones) while assistant
+        messages push out the oldest queued entry instead."""
+        try:
+            self.outbound_queue.put_nowait(message)
+        except asyncio.QueueFull:
+            if message.startswith(USER_TURN_PREFIX):
+                logger.warning("⚠️ Outbound queue full, dropping user transcript")
+                return
+            try:
+                self.outbound_queue.get_nowait()
+                self.outbound_queue.task_done()
+            except QueueEmpty:
+                pass
+            self.outbound_queue.put_nowait(message)
+
+    async def flush(self):
+        """Wait until every queued outbound message has been sent"""
+        await self.outbound_queue.join()
+
+    async def outbound_writer(self):
+        """Send queued messages to the web client, batching bursts into one frame"""
+        while True:
+            message = await self.outbound_queue.get()
+            batch = [message]
+
+            # Coalesce messages that arrive within the batch window
+            while len(batch) < self.outbound_batch_size:
+                try:
+                    batch.append(await asyncio.wait_for(
+                        self.outbound_queue.get(), self.outbound_batch_window
+                    ))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                if not self.web_client:
+                    logger.debug("📤 No web client, dropping %d outbound messages", len(batch))
+                    continue
+
+                # Queued messages are already serialized, so a batch is a
+                # straight byte concatenation; frames go out as binary and
+                # the browser decodes with a single TextDecoder
+                if len(batch) == 1:
+                    payload = batch[0]
+                else:
+                    payload = BATCH_PREFIX + b",".join(batch) + BATCH_SUFFIX
+
+                try:
+                    await self.web_client.send(payload)
+                    logger.debug("✅ Sent %d message(s) to web client", len(batch))
+                except websockets.exceptions.ConnectionClosed:
+                    logger.info("🔴 Web client disconnected during send")
+                    self.web_client = None
+                except Exception as e:
+                    logger.error(f"Error sending to web client: {e}")
+                    self.web_client = None
+            finally:
+                for _ in batch:
+                    self.outbound_queue.task_done()
 
     async def send_transcripts_to_client(self, transcript: str):
+        # Most interim Deepgram packets parse to an empty transcript; bail
+        # out before any JSON encode or frame is spent on them
+        if not transcript:
+            return
+
         if not self.web_client:
             logger.debug("📤 No web client, skipping send to client")
             return
-        
-        user_message = json.dumps({
-            "type": "turn", 
-            "data": {
-                "role": "user",
-                "content": transcript
-            }
-        })
-        
-        try:
-            await self.web_client.send(user_message)
-            logger.info(f"✅ Sent transcript to web client: '{transcript}'")
-            
-        except websockets.exceptions.ConnectionClosed:
-            logger.info("🔴 Web client disconnected during transcript send")
-            self.web_client = None
-        except Exception as e:
-            logger.error(f"Error sending transcript to web client: {e}")
-            self.web_client = None
+
+        self.enqueue_outbound(USER_TURN_PREFIX + json_dumps(transcript) + TURN_SUFFIX)
+        logger.debug("✅ Queued transcript for web client: '%s'", transcript)
+
+    async def _send_ai_sentence(self, sentence: str):
+        """Queue one AI response sentence for the web client"""
+        if self.web_client:
+            self.enqueue_outbound(ASSISTANT_TURN_PREFIX + json_dumps(sentence) + TURN_SUFFIX)
+            logger.debug("🤖 Queued AI response: '%s'", sentence)
 
     async def send_words_to_openai(self, transcript: str):
         """Send transcript to OpenAI for AI responses"""
         if not self.web_client:
             logger.debug("🤖 No web client, returning early")
             return
-        
+
         if not transcript.strip():
             logger.debug("🤖 No transcript to send to OpenAI")
             return
-        
-        logger.info(f"🤖 Sending transcript to OpenAI: '{transcript}'")
-        
+
+        logger.debug("🤖 Sending transcript to OpenAI: '%s'", transcript)
+
         try:
-            # Define callback function to send AI responses sentence by sentence
-            async def send_ai_response(sentence: str):
-                if self.web_client:
-                    ai_message = json.dumps({
-                        "type": "turn", 
-                        "data": {
-                            "role": "assistant",
-                            "content": sentence
-                        }
-                    })
-                    await self.web_client.send(ai_message)
-                    logger.info(f"🤖 Sent AI response: '{sentence}'")
-            
-            logger.info("🤖 Calling OpenAI service...")
-            await self.openai_service.send_to_openai(transcript, send_ai_response)
-            logger.info("🤖 OpenAI service call completed")
+            await self.openai_service.send_to_openai(transcript, self._send_ai_sentence)
+            logger.debug("🤖 OpenAI service call completed")
             
         except websockets.exceptions.ConnectionClosed:
             logger.info("🔴 Web client disconnected during OpenAI processing")
             self.web_client = None
-        except Exception as e:
-            logger.error(f"Error sending transcript to OpenAI: {e}")
-            import traceback
-            logger.error(f"❌ Traceback: {traceback.format_exc()}")
+        except Exception:
+            logger.exception("❌ Error sending transcript to OpenAI")
             self.web_client = None
 
     async def handle_client(self, websocket):
         """Handle web client connection"""
-        if self.web_client:
-            logger.warning("🔴 Another web client is already connected. Rejecting new connection.")
-            await websocket.close()
-            return
-            
+        async with self._client_lock:
+            # Reject only if the current client is still alive; a dead
+            # connection that has not been cleaned up yet can be replaced
+            if self.web_client is not None and self.web_client.close_code is None:
+                logger.warning("🔴 Another web client is already connected. Rejecting new connection.")
+                await websocket.close()
+                return
+            self.web_client = websocket
+
         logger.info("🔵 New web client connected")
-        self.web_client = websocket
+        writer_task = asyncio.create_task(self.outbound_writer())
 
         try:
             async for message in websocket:
-                if isinstance(message, str):
-                    await self.audio_service.handle_message(message)
-                else:
-                    logger.warning(f"Unexpected message format from web client: {type(message)}")
+                # Binary frames are raw audio, text frames carry JSON control data
+                await self.audio_service.handle_message(message)
 
         except websockets.exceptions.ConnectionClosed:
             logger.info("🔴 Web client disconnected")
         except Exception as e:
             logger.error(f"❌ Error with web client: {e}")
         finally:
-            self.web_client = None
+            writer_task.cancel()
+            async with self._client_lock:
+                if self.web_client is websocket:
+                    self.web_client = None
 
     async def start(self):
         """Start the main server"""
@@ -174,7 +277,18 @@ class MainServer:
 
         self.periodic_task = asyncio.create_task(self.process_transcripts_periodically())
         
-        async with websockets.serve(self.handle_client, self.host, self.port):
+        # Frames to/from the browser are small (PCM chunks, short JSON
+        # turns): permessage-deflate costs more CPU per frame than the few
+        # bytes it saves, and the explicit limits bound memory per client
+        async with websockets.serve(
+            self.handle_client,
+            self.host,
+            self.port,
+            compression=None,
+            max_size=2**20,
+            max_queue=32,
+            write_limit=2**16
+        ):
             logger.info("✅ MainServer is running")
             await asyncio.Future()
 
@@ -189,6 +303,13 @@ class MainServer:
 
 
 if __name__ == "__main__":
+    try:
+        import uvloop
+        uvloop.install()
+        logger.info("Using uvloop event loop")
+    except ImportError:
+        logger.info("uvloop not available, using default event loop")
+
     server = MainServer()
     try:
         asyncio.run(server.start())
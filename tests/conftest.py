@@ -1,39 +1,13 @@
 import pytest
-import asyncio
 import sys
 import os
 
 # Add the parent directory to the path so we can import our modules
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-@pytest.fixture(scope="session")
-def event_loop():
-    """Create an instance of the default event loop for the test session."""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
-
 @pytest.fixture(autouse=True)
-def setup_test_env():
+def setup_test_env(monkeypatch):
     """Set up test environment variables."""
-    # Set test environment variables
-    test_env = {
-        'OPENAI_API_KEY': 'test_openai_key',
-        'DEEPGRAM_API_KEY': 'test_deepgram_key',
-        'ELEVEN_LABS_API_KEY': 'test_elevenlabs_key'
-    }
-    
-    # Store original environment
-    original_env = {}
-    for key in test_env:
-        original_env[key] = os.environ.get(key)
-        os.environ[key] = test_env[key]
-    
-    yield
-    
-    # Restore original environment
-    for key, value in original_env.items():
-        if value is not None:
-            os.environ[key] = value
-        elif key in os.environ:
-            del os.environ[key] 
\ No newline at end of file
+    monkeypatch.setenv('OPENAI_API_KEY', 'test_openai_key')
+    monkeypatch.setenv('DEEPGRAM_API_KEY', 'test_deepgram_key')
+    monkeypatch.setenv('ELEVEN_LABS_API_KEY', 'test_elevenlabs_key') 
\ No newline at end of file
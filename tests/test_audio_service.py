@@ -42,7 +42,6 @@ class TestAudioService:
         assert 'punctuate=true' in url
         assert 'interim_results=true' in url
 
-    @pytest.mark.asyncio
     async def test_connect_to_deepgram_success(self, service):
         """Test successful DeepGram connection"""
         with patch('audio_service.websockets.connect', new_callable=AsyncMock) as mock_connect:
@@ -54,7 +53,6 @@ class TestAudioService:
             assert result is True
             assert service.deepgram_ws == mock_websocket
 
-    @pytest.mark.asyncio
     async def test_connect_to_deepgram_failure(self, service):
         """Test failed DeepGram connection"""
         with patch('audio_service.websockets.connect', new_callable=AsyncMock) as mock_connect:
@@ -64,7 +62,6 @@ class TestAudioService:
             
             assert result is False
 
-    @pytest.mark.asyncio
     async def test_send_audio_data(self, service, mock_websocket):
         """Test sending audio data to DeepGram"""
         service.deepgram_ws = mock_websocket
@@ -77,7 +74,6 @@ class TestAudioService:
         # Verify audio was sent
         mock_websocket.send.assert_called_once_with(audio_data)
 
-    @pytest.mark.asyncio
     async def test_send_audio_data_not_connected(self, service):
         """Test sending audio data when not connected"""
         service.deepgram_ws = None
@@ -87,7 +83,6 @@ class TestAudioService:
         result = await service.send_audio(audio_data)
         assert result is False
 
-    @pytest.mark.asyncio
     async def test_send_control_message(self, service, mock_websocket):
         """Test sending control message to DeepGram"""
         service.deepgram_ws = mock_websocket
@@ -98,9 +93,8 @@ class TestAudioService:
         mock_websocket.send.assert_called_once()
         sent_data = mock_websocket.send.call_args[0][0]
         print(sent_data)
-        assert '{"type": "CloseStream"}' == sent_data
+        assert json.loads(sent_data) == {"type": "CloseStream"}
 
-    @pytest.mark.asyncio
     async def test_send_keepalive_message(self, service, mock_websocket):
         """Test sending keepalive message to DeepGram"""
         service.deepgram_ws = mock_websocket
@@ -117,9 +111,8 @@ class TestAudioService:
         # Verify keepalive was sent
         mock_websocket.send.assert_called()
         sent_calls = mock_websocket.send.call_args_list
-        assert any('{"type": "KeepAlive"}' in call[0][0] for call in sent_calls)
+        assert any(json.loads(call[0][0]) == {"type": "KeepAlive"} for call in sent_calls)
 
-    @pytest.mark.asyncio
     async def test_handle_message_audio(self, service):
         """Test handling audio message"""
         with patch.object(service, 'send_audio', new_callable=AsyncMock) as mock_send:
@@ -133,7 +126,35 @@ class TestAudioService:
             
             mock_send.assert_called_once()
 
-    @pytest.mark.asyncio
+    async def test_handle_message_binary_audio(self, service):
+        """Test handling raw binary audio frame"""
+        with patch.object(service, 'send_audio', new_callable=AsyncMock) as mock_send:
+            audio_bytes = b"raw audio bytes"
+
+            await service.handle_message(audio_bytes)
+
+            mock_send.assert_called_once_with(audio_bytes)
+
+    async def test_handle_message_speech_start(self, service):
+        """Test handling speech start control message"""
+        message = json.dumps({
+            "type": "speech_start",
+            "startTime": 1000.0
+        })
+
+        await service.handle_message(message)
+
+        assert service.speech_start_timestamp == 1000.0
+        assert service.last_audio_start_time == 1000.0
+
+    async def test_handle_message_speech_start_not_overwritten(self, service):
+        """Test that the first speech start timestamp is kept"""
+        await service.handle_message(json.dumps({"type": "speech_start", "startTime": 1000.0}))
+        await service.handle_message(json.dumps({"type": "speech_start", "startTime": 2000.0}))
+
+        assert service.speech_start_timestamp == 1000.0
+        assert service.last_audio_start_time == 2000.0
+
     async def test_handle_message_control(self, service):
         """Test handling control message"""
         with patch.object(service, 'send_control', new_callable=AsyncMock) as mock_send:
@@ -147,7 +168,6 @@ class TestAudioService:
             
             mock_send.assert_called_once_with(control_data)
 
-    @pytest.mark.asyncio
     async def test_handle_message_invalid_json(self, service):
         """Test handling invalid JSON message"""
         invalid_message = "invalid json"
@@ -155,7 +175,6 @@ class TestAudioService:
         # Should not raise an exception
         await service.handle_message(invalid_message)
 
-    @pytest.mark.asyncio
     async def test_get_transcript(self, service, transcript_queue):
         """Test getting transcripts from queue"""
         test_transcript = "Hello world"
@@ -168,7 +187,6 @@ class TestAudioService:
         
         assert queue_item["transcript"] == test_transcript
 
-    @pytest.mark.asyncio
     async def test_listen_for_transcripts_success(self, service):
         """Test successful transcript listening"""
         mock_websocket = AsyncMock()
@@ -192,7 +210,6 @@ class TestAudioService:
         except asyncio.TimeoutError:
             pass  # Expected timeout
 
-    @pytest.mark.asyncio
     async def test_listen_for_transcripts_not_connected(self, service):
         """Test transcript listening when not connected"""
         service.deepgram_ws = None
@@ -200,7 +217,6 @@ class TestAudioService:
         # Should not raise an exception
         await service.listen_for_transcripts()
 
-    @pytest.mark.asyncio
     async def test_initialize_success(self, service):
         """Test successful service initialization"""
         with patch.object(service, 'initialize_deepgram', new_callable=AsyncMock) as mock_init:
@@ -210,7 +226,6 @@ class TestAudioService:
             
             assert result is True
 
-    @pytest.mark.asyncio
     async def test_initialize_deepgram_failure(self, service):
         """Test failed service initialization"""
         with patch.object(service, 'initialize_deepgram', new_callable=AsyncMock) as mock_init:
@@ -220,7 +235,6 @@ class TestAudioService:
             
             assert result is False
 
-    @pytest.mark.asyncio
     async def test_close_service(self, service, mock_websocket):
         """Test closing the service"""
         service.deepgram_ws = mock_websocket
@@ -230,7 +244,6 @@ class TestAudioService:
         mock_websocket.send.assert_called_once()
         mock_websocket.close.assert_called_once()
 
-    @pytest.mark.asyncio
     async def test_close_service_not_connected(self, service):
         """Test closing service when not connected"""
         service.deepgram_ws = None
@@ -242,7 +255,6 @@ class TestAudioService:
         """Test getting the transcript queue"""
         assert service.transcript_queue == transcript_queue
 
-    @pytest.mark.asyncio
     async def test_adjust_timestamps(self, service):
         """Test timestamp adjustment"""
         # Set speech start timestamp
@@ -269,9 +281,7 @@ class TestAudioService:
         assert adjusted_response["start"] == 1001.0
         assert adjusted_response["channel"]["alternatives"][0]["words"][0]["start"] == 1001.5
         assert adjusted_response["channel"]["alternatives"][0]["words"][0]["end"] == 1002.0
-        assert "retrieval_time" in adjusted_response
 
-    @pytest.mark.asyncio
     async def test_adjust_timestamps_no_speech_start(self, service):
         """Test timestamp adjustment when no speech start timestamp"""
         response = {
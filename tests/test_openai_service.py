@@ -22,7 +22,7 @@ class TestOpenAIService:
 
     def test_init(self, service):
         """Test service initialization"""
-        assert service.conversation_history == []
+        assert len(service.conversation_history) == 0
         assert isinstance(service.call_state, CallState)
         assert isinstance(service.patient_info, PatientInfo)
         assert service.name == "Spike Bot"
@@ -110,17 +110,16 @@ class TestOpenAIService:
         """Test that message history is truncated to 30 messages"""
         # Create 35 messages
         for i in range(35):
-            service.conversation_history.append({
-                "role": "user" if i % 2 == 0 else "assistant",
-                "content": f"message {i}"
-            })
+            service.append_turn(
+                "user" if i % 2 == 0 else "assistant",
+                f"message {i}"
+            )
         
         messages = service.build_messages()
         
         # Should have 31 messages (system + 30 from history)
         assert len(messages) == 31
 
-    @pytest.mark.asyncio
     async def test_parse_response_success(self, service, mock_openai_client):
         """Test successful response parsing"""
         # Mock the parsing response
@@ -144,7 +143,6 @@ class TestOpenAIService:
         assert service.call_state.copay == 25.0
         assert service.call_state.deductible == 1000.0
 
-    @pytest.mark.asyncio
     async def test_parse_response_none_result(self, service, mock_openai_client):
         """Test parsing when OpenAI returns None"""
         mock_response = Mock()
@@ -156,7 +154,6 @@ class TestOpenAIService:
             {"role": "user", "content": "test"}
         ])
 
-    @pytest.mark.asyncio
     async def test_parse_response_exception(self, service, mock_openai_client):
         """Test parsing when OpenAI raises an exception"""
         mock_openai_client.responses.parse = AsyncMock(side_effect=Exception("API Error"))
@@ -166,7 +163,6 @@ class TestOpenAIService:
             {"role": "user", "content": "test"}
         ])
 
-    @pytest.mark.asyncio
     async def test_send_to_openai_success(self, service, mock_openai_client):
         """Test successful OpenAI communication"""
         # Mock streaming response
@@ -196,7 +192,6 @@ class TestOpenAIService:
         assert response is None
         assert len(service.conversation_history) == 2  # user + assistant
 
-    @pytest.mark.asyncio
     async def test_send_to_openai_with_callback(self, service, mock_openai_client):
         """Test OpenAI communication with response callback"""
         # Mock streaming response
@@ -221,7 +216,6 @@ class TestOpenAIService:
         # send_to_openai returns None, responses are sent via callback
         assert response is None
 
-    @pytest.mark.asyncio
     async def test_send_to_openai_exception(self, service, mock_openai_client):
         """Test OpenAI communication when an exception occurs"""
         mock_openai_client.chat.completions.create = AsyncMock(side_effect=Exception("API Error"))
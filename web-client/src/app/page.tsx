@@ -25,6 +25,9 @@ declare global {
   }
 }
 
+// Shared decoder for binary server frames
+const serverFrameDecoder = new TextDecoder();
+
 export default function Home() {
   const [messages, setMessages] = useState<Message[]>([]);
   const [isStarted, setIsStarted] = useState(false);
@@ -192,61 +195,74 @@ export default function Home() {
     }
   };
 
+  const handleServerMessage = (response: any) => {
+    // Handle turn messages from server (both user and assistant)
+    if (response.type === 'turn' && response.data) {
+      const { role, content } = response.data;
+      if (content) {
+        if (role === 'user') {
+          // Handle streaming user messages
+          setMessages(prev => {
+            const lastMessage = prev[prev.length - 1];
+
+            // If the last message is from the user, replace its content
+            if (lastMessage && lastMessage.role === 'user') {
+              const updatedMessages = [...prev];
+              updatedMessages[updatedMessages.length - 1] = {
+                ...lastMessage,
+                content: content,
+                timestamp: new Date()
+              };
+              console.log('🔄 Updated existing user message:', content);
+              return updatedMessages;
+            } else {
+              // If the last message is from assistant or no messages, create new user message
+              const newMessage: Message = {
+                id: Date.now().toString(),
+                role: 'user',
+                content: content,
+                timestamp: new Date()
+              };
+              console.log('👤 Created new user message:', content);
+              return [...prev, newMessage];
+            }
+          });
+        } else if (role === 'assistant') {
+          // Add assistant message to chat
+          addOrUpdateAssistantMessage(content);
+          console.log('🤖 Assistant message received from server:', content);
+
+          // Synthesize and play speech for assistant messages
+          synthesizeAndPlaySpeech(content);
+        }
+      }
+    }
+  };
+
   const connectToServer = () => {
     const url = 'ws://localhost:8765';
-    
+
     try {
       websocketRef.current = new WebSocket(url);
-      
+      websocketRef.current.binaryType = 'arraybuffer';
+
       websocketRef.current.onopen = () => {
         console.log('🟢 WebSocket connection to server opened');
       };
       
       websocketRef.current.onmessage = (event) => {
         try {
-          const response = JSON.parse(event.data);
-          console.log('📡 Server response:', response);
-          
-          // Handle turn messages from server (both user and assistant)
-          if (response.type === 'turn' && response.data) {
-            const { role, content } = response.data;
-            if (content) {
-              if (role === 'user') {
-                // Handle streaming user messages
-                setMessages(prev => {
-                  const lastMessage = prev[prev.length - 1];
-                  
-                  // If the last message is from the user, replace its content
-                  if (lastMessage && lastMessage.role === 'user') {
-                    const updatedMessages = [...prev];
-                    updatedMessages[updatedMessages.length - 1] = {
-                      ...lastMessage,
-                      content: content,
-                      timestamp: new Date()
-                    };
-                    console.log('🔄 Updated existing user message:', content);
-                    return updatedMessages;
-                  } else {
-                    // If the last message is from assistant or no messages, create new user message
-                    const newMessage: Message = {
-                      id: Date.now().toString(),
-                      role: 'user',
-                      content: content,
-                      timestamp: new Date()
-                    };
-                    console.log('👤 Created new user message:', content);
-                    return [...prev, newMessage];
-                  }
-                });
-              } else if (role === 'assistant') {
-                // Add assistant message to chat
-                addOrUpdateAssistantMessage(content);
-                console.log('🤖 Assistant message received from server:', content);
-                
-                // Synthesize and play speech for assistant messages
-                synthesizeAndPlaySpeech(content);
-              }
-            }
+          // The server sends JSON as binary frames; text frames still work
+          const raw = typeof event.data === 'string'
+            ? event.data
+            : serverFrameDecoder.decode(event.data);
+          const parsed = JSON.parse(raw);
+          console.log('📡 Server response:', parsed);
+
+          // The server batches bursts of messages into a single frame
+          const items = parsed.type === 'batch' ? parsed.items : [parsed];
+          for (const item of items) {
+            handleServerMessage(item);
           }
         } catch (error) {
           console.error('❌ Error parsing server response:', error);
@@ -280,58 +296,28 @@ export default function Home() {
       for (let i = 0; i < audioArray.length; i++) {
         int16Array[i] = Math.max(-32768, Math.min(32767, audioArray[i] * 32768));
       }
-      
-      // Convert to base64 for JSON transmission - use a more efficient method
-      const uint8Array = new Uint8Array(int16Array.buffer);
-      let binaryString = '';
-      for (let i = 0; i < uint8Array.length; i++) {
-        binaryString += String.fromCharCode(uint8Array[i]);
-      }
-      const base64Audio = btoa(binaryString);
-      
-      // Send audio data as structured message
-      const audioMessage = {
-        type: "audio",
-        data: base64Audio
-      };
-      
-      websocketRef.current.send(JSON.stringify(audioMessage));
+
+      // Send raw PCM as a binary WebSocket frame - no base64/JSON envelope
+      websocketRef.current.send(int16Array.buffer);
     } catch (error) {
       console.error('❌ Error sending audio to server:', error);
     }
   };
 
-  const sendAudioToServerWithTimestamp = (audioArray: Float32Array, startTime: number) => {
+  const sendSpeechStartToServer = (startTime: number) => {
     if (!websocketRef.current || websocketRef.current.readyState !== WebSocket.OPEN) {
       console.error('❌ WebSocket not connected');
       return;
     }
 
     try {
-      // Convert Float32Array to Int16Array for server
-      const int16Array = new Int16Array(audioArray.length);
-      for (let i = 0; i < audioArray.length; i++) {
-        int16Array[i] = Math.max(-32768, Math.min(32767, audioArray[i] * 32768));
-      }
-      
-      // Convert to base64 for JSON transmission - use a more efficient method
-      const uint8Array = new Uint8Array(int16Array.buffer);
-      let binaryString = '';
-      for (let i = 0; i < uint8Array.length; i++) {
-        binaryString += String.fromCharCode(uint8Array[i]);
-      }
-      const base64Audio = btoa(binaryString);
-      
-      // Send audio data as structured message with timestamp
-      const audioMessage = {
-        type: "audio",
-        data: base64Audio,
+      // Timestamps travel in a lightweight control message, once per speech segment
+      websocketRef.current.send(JSON.stringify({
+        type: "speech_start",
         startTime: startTime
-      };
-      
-      websocketRef.current.send(JSON.stringify(audioMessage));
+      }));
     } catch (error) {
-      console.error('❌ Error sending audio to server:', error);
+      console.error('❌ Error sending speech start to server:', error);
     }
   };
 
@@ -431,6 +417,7 @@ export default function Home() {
             if (speechStartTimeRef.current === null) {
               speechStartTimeRef.current = Date.now();
               console.log('🎤 Speech started at:', new Date(speechStartTimeRef.current).toISOString());
+              sendSpeechStartToServer(speechStartTimeRef.current);
             }
             sendAudioToServer(frame);
           }
@@ -450,8 +437,8 @@ export default function Home() {
             // Create audio clip from the complete speech segment
             createAudioClip(audioArray);
             
-            // Send final audio chunk to server with speech start timestamp
-            sendAudioToServerWithTimestamp(audioArray, speechStartTimeRef.current || Date.now());
+            // Send final audio chunk to server as a binary frame
+            sendAudioToServer(audioArray);
             
             // Reset speech start time
             speechStartTimeRef.current = null;